@@ -31,7 +31,6 @@ Implementation Notes
 """
 
 import time
-import struct
 from adafruit_bus_device import i2c_device
 from micropython import const
 
@@ -58,6 +57,44 @@ _HTU31D_READTEMPHUM = const(0x00)  # Read the conversion values
 
 _HTU31D_HUMIDITY_RES = ("0.020%", "0.014%", "0.010%", "0.007%")
 _HTU31D_TEMP_RES = ("0.040", "0.025", "0.016", "0.012")
+_HTU31D_HUMIDITY_RES_IDX = {res: idx for idx, res in enumerate(_HTU31D_HUMIDITY_RES)}
+_HTU31D_TEMP_RES_IDX = {res: idx for idx, res in enumerate(_HTU31D_TEMP_RES)}
+_HTU31D_HUMIDITY_RES_ERROR = (
+    f"Humidity resolution must be one of: {_HTU31D_HUMIDITY_RES}"
+)
+_HTU31D_TEMP_RES_ERROR = f"Temperature resolution must be one of: {_HTU31D_TEMP_RES}"
+
+# Maximum conversion times in seconds for each resolution setting,
+# see datasheet Table 5. Humidity and temperature are converted one after
+# the other, so the total wait is the sum of both.
+_HTU31D_HUMIDITY_CONV_TIME = (0.00111, 0.00214, 0.00421, 0.00834)
+_HTU31D_TEMP_CONV_TIME = (0.00157, 0.00306, 0.00601, 0.01198)
+_HTU31D_CONV_TIME_MARGIN = 1.5  # safety factor over the datasheet maximum
+
+_HTU31D_TEMP_SCALE = 165.0 / 65535.0  # degrees Celsius per LSB
+_HTU31D_HUMIDITY_SCALE = 100.0 / 65535.0  # % rH per LSB
+
+
+# Byte-wise lookup table for the CRC-8 used by the sensor,
+# polynomial x^8 + x^5 + x^4 + 1 (0x31), initial value 0
+_CRC_TABLE = (
+    b"\x00\x31\x62\x53\xc4\xf5\xa6\x97\xb9\x88\xdb\xea\x7d\x4c\x1f\x2e"
+    b"\x43\x72\x21\x10\x87\xb6\xe5\xd4\xfa\xcb\x98\xa9\x3e\x0f\x5c\x6d"
+    b"\x86\xb7\xe4\xd5\x42\x73\x20\x11\x3f\x0e\x5d\x6c\xfb\xca\x99\xa8"
+    b"\xc5\xf4\xa7\x96\x01\x30\x63\x52\x7c\x4d\x1e\x2f\xb8\x89\xda\xeb"
+    b"\x3d\x0c\x5f\x6e\xf9\xc8\x9b\xaa\x84\xb5\xe6\xd7\x40\x71\x22\x13"
+    b"\x7e\x4f\x1c\x2d\xba\x8b\xd8\xe9\xc7\xf6\xa5\x94\x03\x32\x61\x50"
+    b"\xbb\x8a\xd9\xe8\x7f\x4e\x1d\x2c\x02\x33\x60\x51\xc6\xf7\xa4\x95"
+    b"\xf8\xc9\x9a\xab\x3c\x0d\x5e\x6f\x41\x70\x23\x12\x85\xb4\xe7\xd6"
+    b"\x7a\x4b\x18\x29\xbe\x8f\xdc\xed\xc3\xf2\xa1\x90\x07\x36\x65\x54"
+    b"\x39\x08\x5b\x6a\xfd\xcc\x9f\xae\x80\xb1\xe2\xd3\x44\x75\x26\x17"
+    b"\xfc\xcd\x9e\xaf\x38\x09\x5a\x6b\x45\x74\x27\x16\x81\xb0\xe3\xd2"
+    b"\xbf\x8e\xdd\xec\x7b\x4a\x19\x28\x06\x37\x64\x55\xc2\xf3\xa0\x91"
+    b"\x47\x76\x25\x14\x83\xb2\xe1\xd0\xfe\xcf\x9c\xad\x3a\x0b\x58\x69"
+    b"\x04\x35\x66\x57\xc0\xf1\xa2\x93\xbd\x8c\xdf\xee\x79\x48\x1b\x2a"
+    b"\xc1\xf0\xa3\x92\x05\x34\x67\x56\x78\x49\x1a\x2b\xbc\x8d\xde\xef"
+    b"\x82\xb3\xe0\xd1\x46\x77\x24\x15\x3b\x0a\x59\x68\xff\xce\x9d\xac"
+)
 
 
 class HTU31D:
@@ -101,24 +138,29 @@ class HTU31D:
             raise ValueError(f"Invalid address: {address:#x}")
         self.i2c_device = i2c_device.I2CDevice(i2c_bus, address)
         self._conversion_command = _HTU31D_CONVERSION
+        # Allocated once and reused for every transaction to avoid heap
+        # allocations on each read: _cmd holds the outgoing command byte,
+        # _buffer receives the 6-byte temperature/humidity frame
+        self._cmd = bytearray(1)
         self._buffer = bytearray(6)
         self.reset()
 
     @property
     def serial_number(self) -> int:
         """The unique 32-bit serial number"""
-        self._buffer[0] = _HTU31D_READSERIAL
+        cmd = self._cmd
+        buf = self._buffer
+        cmd[0] = _HTU31D_READSERIAL
         with self.i2c_device as i2c:
-            i2c.write_then_readinto(self._buffer, self._buffer, out_end=1, in_end=4)
-        ser = struct.unpack(">I", self._buffer[0:4])
-        return ser[0]
+            i2c.write_then_readinto(cmd, buf, in_end=4)
+        return buf[0] << 24 | buf[1] << 16 | buf[2] << 8 | buf[3]
 
     def reset(self) -> None:
         """Perform a soft reset of the sensor, resetting all settings to their power-on defaults"""
         self._conversion_command = _HTU31D_CONVERSION
-        self._buffer[0] = _HTU31D_SOFTRESET
+        self._cmd[0] = _HTU31D_SOFTRESET
         with self.i2c_device as i2c:
-            i2c.write(self._buffer, end=1)
+            i2c.write(self._cmd)
         time.sleep(0.015)
 
     @property
@@ -135,11 +177,11 @@ class HTU31D:
         self._heater = new_mode
         # decide the command!
         if new_mode:
-            self._buffer[0] = _HTU31D_HEATERON
+            self._cmd[0] = _HTU31D_HEATERON
         else:
-            self._buffer[0] = _HTU31D_HEATEROFF
+            self._cmd[0] = _HTU31D_HEATEROFF
         with self.i2c_device as i2c:
-            i2c.write(self._buffer, end=1)
+            i2c.write(self._cmd)
 
     @property
     def relative_humidity(self) -> float:
@@ -155,39 +197,50 @@ class HTU31D:
     def measurements(self) -> Tuple[float, float]:
         """both `temperature` and `relative_humidity`, read simultaneously"""
 
-        temperature = None
-        humidity = None
-
-        self._buffer[0] = self._conversion_command
-        with self.i2c_device as i2c:
-            i2c.write(self._buffer, end=1)
+        dev = self.i2c_device
+        cmd = self._cmd
+        buf = self._buffer
+        command = self._conversion_command
+
+        cmd[0] = command
+        with dev as i2c:
+            i2c.write(cmd)
+
+        # wait conversion time for the selected resolutions
+        # reading temp and hum at OS3 is 20.32 ms, see datasheet Table 5
+        time.sleep(
+            (
+                _HTU31D_HUMIDITY_CONV_TIME[command >> 3 & 3]
+                + _HTU31D_TEMP_CONV_TIME[command >> 1 & 3]
+            )
+            * _HTU31D_CONV_TIME_MARGIN
+        )
 
-        # wait conversion time
-        # Changed as reading temp and hum at OS3 is 20.32 ms
-        # See datasheet Table 5
-        time.sleep(0.03)
-
-        self._buffer[0] = _HTU31D_READTEMPHUM
-        with self.i2c_device as i2c:
-            i2c.write_then_readinto(self._buffer, self._buffer, out_end=1)
+        cmd[0] = _HTU31D_READTEMPHUM
+        with dev as i2c:
+            i2c.write_then_readinto(cmd, buf)
 
         # separate the read data
-        temperature, temp_crc, humidity, humidity_crc = struct.unpack_from(
-            ">HBHB", self._buffer
-        )
+        temperature = buf[0] << 8 | buf[1]
+        temp_crc = buf[2]
+        humidity = buf[3] << 8 | buf[4]
+        humidity_crc = buf[5]
 
         # check CRC of bytes
-        if temp_crc != self._crc(temperature) or humidity_crc != self._crc(humidity):
+        crc = self._crc
+        if temp_crc != crc(temperature) or humidity_crc != crc(humidity):
             raise RuntimeError("Invalid CRC calculated")
 
         # decode data into human values:
         # convert bytes into 16-bit signed integer
         # convert the LSB value to a human value according to the datasheet
-        temperature = -40.0 + 165.0 * temperature / 65535.0
+        temperature = -40.0 + temperature * _HTU31D_TEMP_SCALE
 
         # repeat above steps for humidity data
-        humidity = 100 * humidity / 65535.0
-        humidity = max(min(humidity, 100), 0)
+        humidity = humidity * _HTU31D_HUMIDITY_SCALE
+        # comparison is cheaper than a min() call on CircuitPython
+        if humidity > 100.0:  # pylint: disable=consider-using-min-builtin
+            humidity = 100.0
 
         return (temperature, humidity)
 
@@ -210,12 +263,10 @@ class HTU31D:
     def humidity_resolution(
         self, value: Literal["0.020%", "0.014%", "0.010%", "0.007%"]
     ) -> None:
-        if value not in _HTU31D_HUMIDITY_RES:
-            raise ValueError(
-                f"Humidity resolution must be one of: {_HTU31D_HUMIDITY_RES}"
-            )
+        hum_res = _HTU31D_HUMIDITY_RES_IDX.get(value)
+        if hum_res is None:
+            raise ValueError(_HTU31D_HUMIDITY_RES_ERROR)
         register = self._conversion_command & 0xE7
-        hum_res = _HTU31D_HUMIDITY_RES.index(value)
         self._conversion_command = register | hum_res << 3
 
     @property
@@ -237,28 +288,13 @@ class HTU31D:
     def temp_resolution(
         self, value: Literal["0.040", "0.025", "0.016", "0.012"]
     ) -> None:
-        if value not in _HTU31D_TEMP_RES:
-            raise ValueError(
-                f"Temperature resolution must be one of: {_HTU31D_TEMP_RES}"
-            )
+        temp_res = _HTU31D_TEMP_RES_IDX.get(value)
+        if temp_res is None:
+            raise ValueError(_HTU31D_TEMP_RES_ERROR)
         register = self._conversion_command & 0xF9
-        temp_res = _HTU31D_TEMP_RES.index(value)
         self._conversion_command = register | temp_res << 1
 
     @staticmethod
-    def _crc(value) -> int:
-        polynom = 0x988000  # x^8 + x^5 + x^4 + 1
-        msb = 0x800000
-        mask = 0xFF8000
-        result = value << 8  # Pad with zeros as specified in spec
-
-        while msb != 0x80:
-            # Check if msb of current value is 1 and apply XOR mask
-            if result & msb:
-                result = ((result ^ polynom) & mask) | (result & ~mask)
-            # Shift by one
-            msb >>= 1
-            mask >>= 1
-            polynom >>= 1
-
-        return result
+    def _crc(value: int) -> int:
+        crc = _CRC_TABLE[value >> 8]
+        return _CRC_TABLE[crc ^ (value & 0xFF)]